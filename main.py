@@ -39,6 +39,7 @@ def parse_args() -> argparse.Namespace:
 
     p.add_argument("--warmup_bdays", type=int, default=260, help="Business-day warmup downloaded before start")
     p.add_argument("--outdir", type=str, default="outputs")
+    p.add_argument("--csv", action="store_true", help="Also write the daily timeseries as CSV")
 
     return p.parse_args()
 
@@ -107,7 +108,21 @@ def main() -> None:
     bt["equity_strategy_rebased"] = bt["equity_strategy"] / bt["equity_strategy"].iloc[0]
     bt["equity_buyhold_rebased"] = bt["equity_buyhold"] / bt["equity_buyhold"].iloc[0]
 
-    bt.to_csv(outdir / "daily_timeseries.csv", index=True)
+    report_cols = [
+        "close", "adj_close", "ret", "signal", "vol_ann",
+        "w_target", "w_exec", "w_lag", "turnover", "costs",
+        "strategy_returns_gross", "strategy_returns",
+        "equity_buyhold", "equity_strategy",
+        "equity_strategy_rebased", "equity_buyhold_rebased",
+    ]
+    bt[report_cols].to_parquet(
+        outdir / "daily_timeseries.parquet",
+        engine="pyarrow",
+        compression="zstd",
+        compression_level=3,
+    )
+    if args.csv:
+        bt[report_cols].to_csv(outdir / "daily_timeseries.csv", index=True)
 
     summary = {
         **asdict(cfg),
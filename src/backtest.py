@@ -3,6 +3,12 @@ from __future__ import annotations
 from dataclasses import dataclass
 import numpy as np
 import pandas as pd
+from numba import njit
+
+try:
+    import numexpr as ne
+except ImportError:  # optional: fall back to plain NumPy
+    ne = None
 
 from .strategy import realized_vol_annualized, vol_target_weights, trend_signal_3level
 
@@ -23,6 +29,42 @@ class BacktestConfig:
     trading_days_per_year: int = 252    # DAILY
 
 
+# Functions available to _evaluate expressions on the NumPy fallback path
+_NUMPY_FUNCS = {"__builtins__": {}, "log1p": np.log1p}
+
+
+def _evaluate(expr: str, **operands: np.ndarray | float) -> np.ndarray:
+    """
+    Evaluate an elementwise expression with numexpr when installed, else the
+    same expression string with NumPy, so both paths share one definition.
+    """
+    if ne is not None:
+        return ne.evaluate(expr, local_dict=operands)
+    return eval(expr, _NUMPY_FUNCS, operands)
+
+
+@njit(cache=True)
+def _exec_loop(target_w: np.ndarray, rebal_mask: np.ndarray, threshold: float) -> np.ndarray:
+    """
+    Path-dependent execution state machine over raw arrays (compiled by Numba).
+    """
+    n = target_w.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    last_w = 0.0
+
+    for i in range(n):
+        w = target_w[i]
+        if np.isfinite(w) and rebal_mask[i]:
+            denom = abs(last_w) if abs(last_w) > 1e-6 else 1e-6
+            rel_change = abs(w - last_w) / denom
+            if rel_change >= threshold:
+                last_w = w
+
+        out[i] = last_w
+
+    return out
+
+
 def _apply_rebalance_with_threshold_daily(
     target_w: pd.Series,
     freq: str,
@@ -33,28 +75,19 @@ def _apply_rebalance_with_threshold_daily(
     AND only if relative change is >= threshold. Between rebalances, weight is held.
     """
     if freq == "D":
-        rebalance_mask = pd.Series(True, index=target_w.index)
+        rebalance_mask = np.ones(len(target_w), dtype=np.bool_)
     else:
-        rebalance_dates = target_w.resample(freq).last().index
-        rebalance_mask = pd.Series(target_w.index.isin(rebalance_dates), index=target_w.index)
-
-    executed = pd.Series(np.nan, index=target_w.index, dtype=float)
-    last_w = 0.0
-
-    for dt, w in target_w.items():
-        if not np.isfinite(w):
-            executed.loc[dt] = last_w
-            continue
-
-        if bool(rebalance_mask.loc[dt]):
-            denom = max(abs(last_w), 1e-6)
-            rel_change = abs(w - last_w) / denom
-            if rel_change >= threshold:
-                last_w = float(w)
+        # Both indexes are sorted: locate rebalance dates by binary search
+        idx_i8 = target_w.index.asi8
+        reb_i8 = target_w.resample(freq).last().index.as_unit(target_w.index.unit).asi8
+        pos = np.searchsorted(idx_i8, reb_i8)
+        hit = (pos < len(idx_i8)) & (idx_i8[np.clip(pos, 0, len(idx_i8) - 1)] == reb_i8)
+        rebalance_mask = np.zeros(len(idx_i8), dtype=np.bool_)
+        rebalance_mask[pos[hit]] = True
 
-        executed.loc[dt] = last_w
-
-    return executed
+    tgt = np.ascontiguousarray(target_w.to_numpy(dtype=np.float64, copy=False))
+    executed = _exec_loop(tgt, rebalance_mask, float(threshold))
+    return pd.Series(executed, index=target_w.index)
 
 
 def run_backtest(prices: pd.DataFrame, cfg: BacktestConfig) -> pd.DataFrame:
@@ -65,49 +98,69 @@ def run_backtest(prices: pd.DataFrame, cfg: BacktestConfig) -> pd.DataFrame:
       - vol targeting based on realized vol of daily returns (annualized sqrt(252))
       - weekly rebalancing + threshold to limit turnover
     """
-    df = prices.copy()
+    index = prices.index
+    # Only the price columns the strategy reads are carried into the output
+    arrs: dict[str, np.ndarray] = {c: prices[c].to_numpy() for c in ("close", "adj_close")}
 
     # Daily returns (use adj_close to include dividends when available)
-    df["ret"] = df["adj_close"].pct_change()
+    ret_s = prices["adj_close"].pct_change()
+    ret = ret_s.to_numpy(dtype=np.float64)
 
     # 3-level long-only signal on close
-    df["signal"] = trend_signal_3level(df["close"], cfg.ma_fast, cfg.ma_slow)
+    signal_s = trend_signal_3level(prices["close"], cfg.ma_fast, cfg.ma_slow)
 
     # Realized vol annualized
-    df["vol_ann"] = realized_vol_annualized(df["ret"], cfg.vol_window, trading_days=cfg.trading_days_per_year)
+    vol_ann_s = realized_vol_annualized(ret_s, cfg.vol_window, trading_days=cfg.trading_days_per_year)
 
     # Target weights
-    df["w_target"] = vol_target_weights(
-        signal=df["signal"],
-        vol_ann=df["vol_ann"],
+    w_target_s = vol_target_weights(
+        signal=signal_s,
+        vol_ann=vol_ann_s,
         target_vol=cfg.target_vol,
         max_leverage=cfg.max_leverage,
     )
 
     # Executed weights with weekly rebalance + threshold
-    df["w_exec"] = _apply_rebalance_with_threshold_daily(
-        target_w=df["w_target"],
+    w_exec = _apply_rebalance_with_threshold_daily(
+        target_w=w_target_s,
         freq=cfg.rebalance,
         threshold=cfg.rebalance_threshold,
-    )
+    ).to_numpy()
+    w_exec0 = np.where(np.isnan(w_exec), 0.0, w_exec)
 
     # No look-ahead: apply weight from previous day
-    df["w_lag"] = df["w_exec"].shift(1).fillna(0.0)
+    w_lag = np.concatenate(([0.0], w_exec0[:-1]))
 
     # Turnover proxy
-    df["turnover"] = (df["w_exec"].fillna(0.0) - df["w_exec"].fillna(0.0).shift(1).fillna(0.0)).abs()
+    turnover = np.abs(np.diff(w_exec0, prepend=0.0))
 
-    # Costs
     cost_rate = (cfg.fee_bps + cfg.slippage_bps) / 10000.0
-    df["costs"] = cost_rate * df["turnover"]
-
-    # Strategy returns
-    df["strategy_returns_gross"] = df["w_lag"] * df["ret"]
-    df["strategy_returns"] = df["strategy_returns_gross"] - df["costs"]
-
-    # Equity curves
-    df["equity_buyhold"] = (1.0 + df["ret"].fillna(0.0)).cumprod()
-    df["equity_strategy"] = (1.0 + df["strategy_returns"].fillna(0.0)).cumprod()
+    ret0 = np.where(np.isnan(ret), 0.0, ret)
+
+    # Costs, strategy returns and log growth (elementwise stage)
+    costs = _evaluate("cost_rate * turnover", cost_rate=cost_rate, turnover=turnover)
+    strat_gross = _evaluate("w_lag * ret", w_lag=w_lag, ret=ret)
+    strat_net = _evaluate("strat_gross - costs", strat_gross=strat_gross, costs=costs)
+    strat0 = np.where(np.isnan(strat_net), 0.0, strat_net)
+    log_bh = _evaluate("log1p(ret0)", ret0=ret0)
+    log_strat = _evaluate("log1p(strat0)", strat0=strat0)
+
+    arrs.update(
+        ret=ret,
+        signal=signal_s.to_numpy(),
+        vol_ann=vol_ann_s.to_numpy(),
+        w_target=w_target_s.to_numpy(),
+        w_exec=w_exec,
+        w_lag=w_lag,
+        turnover=turnover,
+        costs=costs,
+        strategy_returns_gross=strat_gross,
+        strategy_returns=strat_net,
+        # Equity curves as exp of cumulative log returns
+        equity_buyhold=np.exp(np.cumsum(log_bh)),
+        equity_strategy=np.exp(np.cumsum(log_strat)),
+    )
 
-    df = df.dropna(subset=["ret"], how="any")
-    return df
+    # Drop rows without a return (first bar), then build the frame in one call
+    keep = ~np.isnan(ret)
+    return pd.DataFrame({k: v[keep] for k, v in arrs.items()}, index=index[keep])
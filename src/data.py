@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import time
+import warnings
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
@@ -8,8 +9,6 @@ from pathlib import Path
 
 
 import pandas as pd
-import yfinance as yf
-from pandas_datareader import data as pdr
 
 
 @dataclass(frozen=True)
@@ -38,11 +37,14 @@ def _normalize_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
 
 
 def _download_yfinance(ticker: str, start: str, end: Optional[str]) -> pd.DataFrame:
+    # Imported lazily: not needed at all on a cache hit
+    import yfinance as yf
+
     df = yf.download(
         tickers=ticker,
         start=start,
         end=end,
-        auto_adjust=False,
+        auto_adjust=True,
         progress=False,
         actions=False,
         threads=False,
@@ -54,16 +56,18 @@ def _download_yfinance(ticker: str, start: str, end: Optional[str]) -> pd.DataFr
     # Handle possible MultiIndex columns
     df.columns = [c[0] if isinstance(c, tuple) else c for c in df.columns]
 
-    needed = {"Open", "High", "Low", "Close", "Adj Close", "Volume"}
+    needed = {"Open", "High", "Low", "Close", "Volume"}
     if not needed.issubset(set(df.columns)):
         return pd.DataFrame()
 
+    # auto_adjust=True: Close is already split/dividend adjusted, so the signal
+    # and the returns both run on the same adjusted series
     out = pd.DataFrame(index=df.index)
     out["open"] = df["Open"].astype(float)
     out["high"] = df["High"].astype(float)
     out["low"] = df["Low"].astype(float)
     out["close"] = df["Close"].astype(float)
-    out["adj_close"] = df["Adj Close"].astype(float)
+    out["adj_close"] = out["close"]
     out["volume"] = df["Volume"].astype(float)
 
     return _normalize_ohlcv(out)
@@ -74,6 +78,8 @@ def _download_stooq(ticker: str, start: str, end: Optional[str]) -> pd.DataFrame
     Stooq symbols can differ. We'll try a list of candidates.
     For US tickers, common form is 'spy.us'.
     """
+    from pandas_datareader import data as pdr
+
     base = ticker.lower().replace("^", "")
 
     candidates = []
@@ -126,6 +132,96 @@ def _download_stooq(ticker: str, start: str, end: Optional[str]) -> pd.DataFrame
 
 
 
+# Bump when the layout or meaning of cached columns changes; files written with
+# another version are ignored and rebuilt from a fresh download.
+_CACHE_SCHEMA = 2
+
+
+def _read_cache_attrs(cache_file: Path) -> dict:
+    """
+    Cache metadata (schema, covered range) without loading the bars, or {} if
+    the file is missing or was written with another schema version.
+    """
+    if not cache_file.exists():
+        return {}
+    attrs = pd.read_parquet(cache_file, engine="pyarrow", columns=[]).attrs
+    return attrs if attrs.get("cache_schema") == _CACHE_SCHEMA else {}
+
+
+def _present_end() -> pd.Timestamp:
+    """
+    Exclusive end of the bars that can exist right now (tomorrow, 00:00).
+    """
+    return pd.Timestamp.today().normalize() + pd.Timedelta(days=1)
+
+
+def _coverage_end(end: Optional[str]) -> pd.Timestamp:
+    """
+    Exclusive end a download for [start, end) actually covers: the requested end,
+    or the download time if that end is open or in the future.
+    """
+    present = _present_end()
+    return present if end is None else min(pd.to_datetime(end), present)
+
+
+def _read_cache(cache_file: Path, attrs: dict, start: str, end: Optional[str]) -> Optional[pd.DataFrame]:
+    """
+    Return the cached bars in [start, end) if the per-ticker cache file covers
+    that range, else None. attrs is the file's metadata from _read_cache_attrs.
+
+    An end that is open or in the future only needs coverage up to today, so a
+    cache fetched today is current regardless of when the last bar printed.
+
+    Cached bars were normalized before being written, so they are returned as-is.
+    """
+    if not attrs:
+        return None
+
+    start_dt = pd.to_datetime(start)
+    if pd.to_datetime(attrs["cache_start"]) > start_dt or pd.to_datetime(attrs["cache_end"]) < _coverage_end(end):
+        return None
+
+    filters = [("date", ">=", start_dt)]
+    if end is not None:
+        filters.append(("date", "<", pd.to_datetime(end)))
+    return pd.read_parquet(cache_file, engine="pyarrow", memory_map=True, filters=filters)
+
+
+def _write_cache(
+    cache_file: Path,
+    attrs: dict,
+    df: pd.DataFrame,
+    start: str,
+    end: Optional[str],
+) -> pd.DataFrame:
+    """
+    Merge freshly downloaded (normalized) bars into the per-ticker cache file and
+    record the covered range. attrs is the existing file's metadata ({} if none).
+    Returns the merged frame.
+
+    Coverage never extends past the download time, so bars published later are
+    not silently treated as cached.
+    """
+    cache_start = pd.to_datetime(start)
+    cache_end = _coverage_end(end)
+
+    if attrs:
+        old = pd.read_parquet(cache_file, engine="pyarrow", memory_map=True)
+        cache_start = min(cache_start, pd.to_datetime(attrs["cache_start"]))
+        cache_end = max(cache_end, pd.to_datetime(attrs["cache_end"]))
+        df = pd.concat([old, df]).sort_index()
+        df = df[~df.index.duplicated(keep="last")]
+
+    df = df.rename_axis("date")
+    df.attrs = {
+        "cache_schema": _CACHE_SCHEMA,
+        "cache_start": cache_start.isoformat(),
+        "cache_end": cache_end.isoformat(),
+    }
+    df.to_parquet(cache_file, engine="pyarrow", compression="zstd", compression_level=3)
+    return df
+
+
 def download_price_history(
     ticker: str,
     start: str,
@@ -140,24 +236,34 @@ def download_price_history(
 
     Note: 'end' is treated as exclusive bound in this project.
     Pass (end_inclusive + 1 day) from main.py.
+
+    yfinance bars are cached per ticker in data_cache/{ticker}.parquet, so runs
+    with a different window only hit the network if the cache doesn't cover it.
     """
     cache_dir = Path("data_cache")
     cache_dir.mkdir(exist_ok=True)
-    cache_file = cache_dir / f"{ticker}_{start}_{end}.parquet"
+    cache_file = cache_dir / f"{ticker}.parquet"
+
+    attrs = _read_cache_attrs(cache_file)
+    cached = _read_cache(cache_file, attrs, start, end)
+    if cached is not None:
+        return DataDownloadResult(source="cache", df=cached)
+
+    # On a partial hit, fetch the union so the cache file stays contiguous
+    fetch_start, fetch_end = start, end
+    if attrs:
+        fetch_start = min(pd.to_datetime(start), pd.to_datetime(attrs["cache_start"])).date().isoformat()
+        if end is not None:
+            fetch_end = max(pd.to_datetime(end), pd.to_datetime(attrs["cache_end"])).date().isoformat()
 
-    if cache_file.exists():
-        df = pd.read_parquet(cache_file)
-        df.to_parquet(cache_file)
-        return DataDownloadResult(source="cache", df=_normalize_ohlcv(df))
-    
     # 1) yfinance with retry/backoff
     last_err: Optional[Exception] = None
+    downloaded = pd.DataFrame()
     for attempt in range(1, retries + 1):
         try:
-            df = _download_yfinance(ticker, start, end)
-            if not df.empty:
-                df.to_parquet(cache_file)
-                return DataDownloadResult(source="yfinance", df=df)
+            downloaded = _download_yfinance(ticker, fetch_start, fetch_end)
+            if not downloaded.empty:
+                break
         except Exception as e:
             last_err = e
 
@@ -165,6 +271,21 @@ def download_price_history(
         sleep_for = backoff_seconds * attempt
         time.sleep(sleep_for)
 
+    if not downloaded.empty:
+        # Cache problems must not discard a successful download
+        try:
+            df = _write_cache(cache_file, attrs, downloaded, fetch_start, fetch_end)
+        except Exception as e:
+            warnings.warn(f"Could not update price cache {cache_file}: {e!r}", RuntimeWarning)
+            df = downloaded
+
+        start_dt = pd.to_datetime(start)
+        if end is not None:
+            df = df.loc[(df.index >= start_dt) & (df.index < pd.to_datetime(end))]
+        else:
+            df = df.loc[df.index >= start_dt]
+        return DataDownloadResult(source="yfinance", df=df)
+
     # 2) fallback: Stooq
     try:
         df = _download_stooq(ticker, start, end)
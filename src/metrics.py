@@ -4,55 +4,95 @@ import numpy as np
 import pandas as pd
 
 
-def _annualize_return(equity: pd.Series, trading_days: int = 252) -> float:
-    if equity.empty:
+def _annualize_return(equity: pd.Series | np.ndarray, trading_days: int = 252) -> float:
+    e = np.asarray(equity, dtype=np.float64)
+    if e.size == 0:
         return float("nan")
-    total = float(equity.iloc[-1] / equity.iloc[0])
-    years = len(equity) / trading_days
+    total = float(e[-1] / e[0])
+    years = len(e) / trading_days
     if years <= 0:
         return float("nan")
     return total ** (1.0 / years) - 1.0
 
 
-def _max_drawdown(equity: pd.Series) -> float:
-    if equity.empty:
+def _max_drawdown(equity: pd.Series | np.ndarray) -> float:
+    e = np.asarray(equity, dtype=np.float64)
+    if e.size == 0:
         return float("nan")
-    peak = equity.cummax()
-    dd = equity / peak - 1.0
-    return float(dd.min())
+    peak = np.maximum.accumulate(e)
+    return float(np.min(e / peak) - 1.0)
 
 
 def compute_kpis(strategy_returns: pd.Series, rf_annual: float = 0.0, trading_days: int = 252) -> dict:
     """
     KPIs on strategy daily returns.
     """
-    r = strategy_returns.dropna().astype(float)
-    if r.empty:
+    r = strategy_returns.to_numpy(dtype=np.float64)
+    r = r[~np.isnan(r)]
+    n = len(r)
+    if n == 0:
         return {"error": "no returns"}
 
-    equity = (1.0 + r).cumprod()
+    equity = np.cumprod(1.0 + r)
+
+    # Central moments from one demeaned array (pandas conventions: ddof=1 std,
+    # bias-corrected skew / excess kurtosis)
+    mean = r.mean()
+    d = r - mean
+    d2 = d * d
+    m2 = d2.mean()
+    m3 = (d2 * d).mean()
+    m4 = (d2 * d2).mean()
+    std = float(np.sqrt(m2 * n / (n - 1))) if n > 1 else float("nan")
 
     cagr = _annualize_return(equity, trading_days=trading_days)
-    vol = float(r.std() * np.sqrt(trading_days))
+    vol = std * np.sqrt(trading_days)
 
+    # excess = r - rf_daily has the same dispersion as r
     rf_daily = (1.0 + rf_annual) ** (1.0 / trading_days) - 1.0
-    excess = r - rf_daily
-    sharpe = float(excess.mean() / (excess.std() + 1e-12) * np.sqrt(trading_days))
+    sharpe = float((mean - rf_daily) / (std + 1e-12) * np.sqrt(trading_days))
 
-    downside = r[r < 0]
-    downside_std = float(downside.std() * np.sqrt(trading_days)) if len(downside) > 1 else float("nan")
-    sortino = float(excess.mean() / ((downside.std() + 1e-12)) * np.sqrt(trading_days)) if len(downside) > 1 else float("nan")
+    neg = r < 0
+    pos = r > 0
+    downside = r[neg]
+    if len(downside) > 1:
+        dn_std = float(downside.std(ddof=1))
+        sortino = float((mean - rf_daily) / (dn_std + 1e-12) * np.sqrt(trading_days))
+    else:
+        sortino = float("nan")
 
     mdd = _max_drawdown(equity)
     calmar = float(cagr / abs(mdd)) if mdd < 0 else float("nan")
 
-    hit_rate = float((r > 0).mean())
-    avg_win = float(r[r > 0].mean()) if (r > 0).any() else float("nan")
-    avg_loss = float(r[r < 0].mean()) if (r < 0).any() else float("nan")
+    n_pos = int(pos.sum())
+    hit_rate = n_pos / n
+    avg_win = float(r[pos].mean()) if n_pos else float("nan")
+    avg_loss = float(downside.mean()) if len(downside) else float("nan")
+
+    # Tail-ish diagnostics. Like pandas, moments below the rounding error of a
+    # constant series are treated as zero so constant returns give 0, not noise.
+    eps_scale = np.finfo(np.float64).eps * float(np.abs(r).max())
+    if abs(m2) < eps_scale**2:
+        m2 = 0.0
+    if abs(m3) < eps_scale**3:
+        m3 = 0.0
+    if abs(m4) < eps_scale**4:
+        m4 = 0.0
+
+    if n < 3:
+        skew = float("nan")
+    elif m2 == 0:
+        skew = 0.0
+    else:
+        skew = float(np.sqrt(n * (n - 1)) / (n - 2) * m3 / m2**1.5)
 
-    # Tail-ish diagnostics
-    skew = float(r.skew())
-    kurt = float(r.kurtosis())
+    if n < 4:
+        kurt = float("nan")
+    elif m2 == 0:
+        kurt = 0.0
+    else:
+        g2 = m4 / (m2 * m2) - 3.0
+        kurt = float(((n + 1) * g2 + 6.0) * (n - 1) / ((n - 2) * (n - 3)))
 
     return {
         "CAGR": float(cagr),
@@ -66,6 +106,6 @@ def compute_kpis(strategy_returns: pd.Series, rf_annual: float = 0.0, trading_da
         "AvgDailyLoss": float(avg_loss),
         "Skew": float(skew),
         "Kurtosis": float(kurt),
-        "TotalReturn": float(equity.iloc[-1] - 1.0),
-        "NumDays": int(len(r)),
+        "TotalReturn": float(equity[-1] - 1.0),
+        "NumDays": int(n),
     }
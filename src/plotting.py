@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 from pathlib import Path
-import matplotlib.pyplot as plt
 import pandas as pd
 
 
@@ -13,6 +12,10 @@ def plot_equity_curve(bt: pd.DataFrame, path: Path, title: str) -> None:
     if bt.empty:
         raise ValueError("Backtest dataframe is empty; cannot plot.")
 
+    # Imported lazily to keep matplotlib out of module import time
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
     eq_s = bt["equity_strategy"].astype(float).copy()
     eq_b = bt["equity_buyhold"].astype(float).copy()
 
@@ -20,7 +23,9 @@ def plot_equity_curve(bt: pd.DataFrame, path: Path, title: str) -> None:
     eq_s = eq_s / float(eq_s.iloc[0])
     eq_b = eq_b / float(eq_b.iloc[0])
 
-    fig = plt.figure()
+    # Plain Agg-backed Figure: no pyplot state machine or GUI backend probing
+    fig = Figure()
+    FigureCanvasAgg(fig)
     ax = fig.add_subplot(111)
     ax.plot(bt.index, eq_s, label="Strategy (rebased)")
     ax.plot(bt.index, eq_b, label="Buy&Hold (rebased)")
@@ -30,4 +35,3 @@ def plot_equity_curve(bt: pd.DataFrame, path: Path, title: str) -> None:
     ax.legend()
     fig.tight_layout()
     fig.savefig(path, dpi=160)
-    plt.close(fig)
@@ -4,16 +4,75 @@ import numpy as np
 import pandas as pd
 
 
+def _fast_means(p: np.ndarray, windows: tuple[int, ...]) -> tuple[np.ndarray, ...]:
+    """
+    Rolling means of p for several windows from one shared cumulative sum.
+    As with rolling(window, min_periods=window).mean(), a window containing
+    a NaN yields NaN.
+    """
+    n = len(p)
+    valid = np.isfinite(p)
+    # Offsetting by the first value keeps the cumulative sums small
+    offset = p[valid][0] if valid.any() else 0.0
+    x = np.where(valid, p - offset, 0.0)
+
+    c = np.concatenate(([0.0], np.cumsum(x)))
+    c0 = np.concatenate(([0], np.cumsum(valid)))
+
+    out = []
+    for w in windows:
+        m = np.full(n, np.nan)
+        if n >= w:
+            full = (c0[w:] - c0[:-w]) == w
+            m[w - 1:] = np.where(full, (c[w:] - c[:-w]) / w + offset, np.nan)
+        out.append(m)
+    return tuple(out)
+
+
 def moving_average(series: pd.Series, window: int) -> pd.Series:
-    return series.rolling(window=window, min_periods=window).mean()
+    (out,) = _fast_means(series.to_numpy(dtype=np.float64), (window,))
+    return pd.Series(out, index=series.index)
 
 
-def realized_vol_annualized(returns: pd.Series, window: int, trading_days: int = 252) -> pd.Series:
+def realized_vol_annualized(
+    returns: pd.Series,
+    window: int,
+    trading_days: int = 252,
+    use_fast: bool = True,
+) -> pd.Series:
     """
     Realized volatility: rolling std of daily returns, annualized by sqrt(252).
+
+    use_fast=True computes the rolling variance in one pass from cumulative sums
+    of x and x*x; windows containing a NaN yield NaN, as with pandas rolling.
     """
-    vol_daily = returns.rolling(window=window, min_periods=window).std()
-    return vol_daily * np.sqrt(trading_days)
+    if not use_fast:
+        vol_daily = returns.rolling(window=window, min_periods=window).std()
+        return vol_daily * np.sqrt(trading_days)
+
+    x = returns.to_numpy(dtype=np.float64)
+    n = len(x)
+    vol_daily = np.full(n, np.nan)
+    if window < 2 or n < window:
+        return pd.Series(vol_daily * np.sqrt(trading_days), index=returns.index)
+
+    valid = np.isfinite(x)
+    # Centering on the sample mean limits cancellation in sumsq - sum^2 / W
+    x = np.where(valid, x - x[valid].mean() if valid.any() else 0.0, 0.0)
+
+    c0 = np.concatenate(([0], np.cumsum(valid)))
+    c1 = np.concatenate(([0.0], np.cumsum(x)))
+    c2 = np.concatenate(([0.0], np.cumsum(x * x)))
+
+    count_w = c0[window:] - c0[:-window]
+    sum_w = c1[window:] - c1[:-window]
+    sumsq_w = c2[window:] - c2[:-window]
+
+    var = (sumsq_w - sum_w * sum_w / window) / (window - 1)
+    std = np.sqrt(np.maximum(var, 0.0))
+    vol_daily[window - 1:] = np.where(count_w == window, std, np.nan)
+
+    return pd.Series(vol_daily * np.sqrt(trading_days), index=returns.index)
 
 
 def trend_signal(prices: pd.Series, ma_fast: int, ma_slow: int) -> pd.Series:
@@ -23,13 +82,13 @@ def trend_signal(prices: pd.Series, ma_fast: int, ma_slow: int) -> pd.Series:
       -1 if price < MA_fast < MA_slow
        0 otherwise
     """
-    fast = moving_average(prices, ma_fast)
-    slow = moving_average(prices, ma_slow)
+    p = prices.to_numpy(dtype=np.float64)
+    f, s = _fast_means(p, (ma_fast, ma_slow))
 
-    sig = pd.Series(0.0, index=prices.index)
-    sig[(prices > fast) & (fast > slow)] = 1.0
-    sig[(prices < fast) & (fast < slow)] = -1.0
-    return sig
+    up = (p > f) & (f > s)
+    down = (p < f) & (f < s)
+    sig = np.where(up, 1.0, np.where(down, -1.0, 0.0))
+    return pd.Series(sig, index=prices.index)
 
 
 def vol_target_weights(
@@ -42,10 +101,13 @@ def vol_target_weights(
     Weight = signal * min(max_leverage, target_vol / vol_ann)
     Weight is in [-max_leverage, +max_leverage].
     """
-    raw = target_vol / vol_ann.replace(0.0, np.nan)
-    scale = raw.clip(lower=0.0, upper=max_leverage)
-    w = signal * scale
-    return w
+    v = vol_ann.to_numpy(dtype=np.float64)
+    s = signal.to_numpy(dtype=np.float64)
+    # Zero vol -> NaN weight (as before); safe divisor avoids a divide warning
+    nz = v != 0.0
+    raw = np.where(nz, target_vol / np.where(nz, v, 1.0), np.nan)
+    scale = np.minimum(np.maximum(raw, 0.0), max_leverage)
+    return pd.Series(s * scale, index=signal.index)
 
 def trend_signal_3level(prices: pd.Series, ma_fast: int, ma_slow: int) -> pd.Series:
     """
@@ -56,12 +118,12 @@ def trend_signal_3level(prices: pd.Series, ma_fast: int, ma_slow: int) -> pd.Ser
 
     (You can extend symmetrically for short later.)
     """
-    fast = moving_average(prices, ma_fast)
-    slow = moving_average(prices, ma_slow)
-
-    sig = pd.Series(0.0, index=prices.index)
-    sig[(prices > slow)] = 0.5
-    sig[(prices > fast) & (fast > slow)] = 1.0
-    sig = sig.fillna(0.0)
-    return sig
+    p = prices.to_numpy(dtype=np.float64)
+    f, s = _fast_means(p, (ma_fast, ma_slow))
+
+    # NaN comparisons are False, so warm-up bars fall through to 0.0
+    above_slow = p > s
+    full = above_slow & (p > f) & (f > s)
+    sig = np.where(full, 1.0, np.where(above_slow, 0.5, 0.0))
+    return pd.Series(sig, index=prices.index)
 